@@ -9,8 +9,9 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from scipy import stats
+from typing import Dict, List, Tuple
 
 from financial_modelling import (
     DataManager,
@@ -95,11 +96,100 @@ def setup_page():
         st.markdown("### v1.0.0")
 
 
-def load_data(tickers, start_date, end_date):
-    """Load and cache ETF data."""
+class PartialFetchError(Exception):
+    """Some requested tickers returned no data; carries the prices that did load."""
+
+    def __init__(self, prices: pd.DataFrame, missing: List[str]):
+        super().__init__(f"No price data returned for {', '.join(missing)}")
+        self.prices = prices
+        self.missing = missing
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _fetch_prices(tickers: Tuple[str, ...], start_iso: str, end_iso: str) -> pd.DataFrame:
+    """
+    Fetch combined price data, cached across reruns for one hour.
+
+    DataManager swallows download errors, so a partial result is raised as
+    PartialFetchError instead of returned: exceptions are not cached, and the
+    next rerun retries the missing tickers.
+    """
     dm = DataManager()
-    data = dm.fetch_data(tickers, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    return dm
+    dm.fetch_data(list(tickers), start_iso, end_iso)
+    prices = dm.get_combined_data()
+    missing = [t for t in tickers if t not in prices.columns]
+    if missing:
+        raise PartialFetchError(prices, missing)
+    return prices
+
+
+@st.cache_data(show_spinner=False)
+def _cached_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute log returns from cached prices (keyed on the frame's content hash).
+
+    Returns are stored as float32: display statistics only need a few digits,
+    and PortfolioOptimizer upcasts to float64 before estimating moments.
+    """
+    if prices.empty:
+        return pd.DataFrame()
+    return np.log1p(prices.pct_change()).dropna().astype(np.float32)
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_optimizer(returns: pd.DataFrame, risk_free_rate: float) -> PortfolioOptimizer:
+    """Share one optimizer (and its moment estimates) per (returns, rate) combination."""
+    return PortfolioOptimizer(returns, risk_free_rate)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_frontier(
+    returns: pd.DataFrame, risk_free_rate: float, num_portfolios: int
+) -> Dict[str, np.ndarray]:
+    """
+    Generate the long-only efficient frontier once per (returns, rate, size) combination.
+
+    The closed-form analytical_frontier allows short positions, so it is not
+    plotted here; generate_efficient_frontier respects the optimizer's bounds
+    and already uses the closed form wherever it is feasible.
+    """
+    optimizer = _cached_optimizer(returns, risk_free_rate)
+    return optimizer.generate_efficient_frontier(num_portfolios=num_portfolios)
+
+
+@dataclass
+class DataView:
+    """Read-only view over cached prices exposing the DataManager accessors used here."""
+    prices: pd.DataFrame
+
+    def get_combined_data(self) -> pd.DataFrame:
+        """Get all loaded data as a combined DataFrame."""
+        return self.prices
+
+    def get_returns(self) -> pd.DataFrame:
+        """Get log returns, memoized across reruns."""
+        return _cached_returns(self.prices)
+
+
+def load_data(tickers, start_date, end_date):
+    """
+    Load ETF data through the Streamlit cache.
+
+    Tickers that fail to load are reported with a warning and the rest are
+    shown; only a fetch where nothing loads is an error.
+    """
+    try:
+        prices = _fetch_prices(
+            tuple(sorted(tickers)),
+            start_date.strftime("%Y-%m-%d"),
+            end_date.strftime("%Y-%m-%d"),
+        )
+    except PartialFetchError as e:
+        if e.prices.empty:
+            raise RuntimeError(str(e)) from e
+        st.warning(f"⚠️ {e}; showing the remaining ETFs.")
+        prices = e.prices
+    return DataView(prices)
 
 
 def sidebar_controls():
@@ -152,20 +242,21 @@ def sidebar_controls():
     return tickers, start_date, end_date, risk_free_rate
 
 
-def display_performance_metrics(dm, tickers, risk_free_rate):
+def display_performance_metrics(prices, tickers, risk_free_rate):
     """Display individual ETF performance metrics."""
     st.markdown("<h2 class='section-header'>📈 Individual ETF Performance</h2>", unsafe_allow_html=True)
 
-    cols = st.columns(min(3, max(1, len([t for t in tickers if t in dm.data]))))
+    available = [t for t in tickers if t in prices.columns and prices[t].notna().any()]
+    if not available:
+        return
+    cols = st.columns(min(3, max(1, len(available))))
     col_idx = 0
-    
-    for ticker in tickers:
-        if ticker not in dm.data or dm.data[ticker].empty:
-            continue
 
-        prices = dm.data[ticker][ticker]
-        model = FinancialModel(prices, risk_free_rate)
-        metrics = model.calculate_metrics()
+    # One vectorized pass over all tickers instead of a FinancialModel per ticker
+    batch_metrics = FinancialModel.calculate_metrics_batch(prices[available], risk_free_rate)
+
+    for ticker in available:
+        metrics = batch_metrics.loc[ticker]
 
         with cols[col_idx % len(cols)]:
             st.metric(
@@ -183,26 +274,30 @@ def display_performance_metrics(dm, tickers, risk_free_rate):
         col_idx += 1
 
 
-def plot_price_history(dm, tickers):
-    """Plot price history of selected ETFs."""
-    st.markdown("<h2 class='section-header'>💹 Price History</h2>", unsafe_allow_html=True)
+def _session_figure(name, key, build):
+    """Return a figure cached in session state, rebuilding only when its key changes."""
+    cached = st.session_state.get(name)
+    if cached is None or cached[0] != key:
+        cached = (key, build())
+        st.session_state[name] = cached
+    return cached[1]
 
-    combined_data = dm.get_combined_data()
-    if combined_data.empty:
-        st.warning("No data available")
-        return
 
-    # Create figure
+def _build_price_history_fig(combined_data, tickers):
+    """Build the normalized price history figure."""
     fig = go.Figure()
     colors = px.colors.qualitative.Set2
-    
+
+    # Rebase every series to 100 in one broadcast, using each ticker's first valid price
+    normalized = combined_data.div(combined_data.bfill().iloc[0]).mul(100)
+    dates = normalized.index
+
     for idx, ticker in enumerate(tickers):
-        if ticker in combined_data.columns:
-            normalized = combined_data[ticker] / combined_data[ticker].iloc[0] * 100
+        if ticker in normalized.columns:
             fig.add_trace(
                 go.Scatter(
-                    x=combined_data.index,
-                    y=normalized,
+                    x=dates,
+                    y=normalized[ticker].to_numpy(),
                     name=ticker,
                     mode="lines",
                     line=dict(width=2.5, color=colors[idx % len(colors)]),
@@ -219,85 +314,114 @@ def plot_price_history(dm, tickers):
         template="plotly_white",
         font=dict(size=11),
     )
+    return fig
+
+
+def plot_price_history(combined_data, tickers, fig_key):
+    """Plot price history of selected ETFs."""
+    st.markdown("<h2 class='section-header'>💹 Price History</h2>", unsafe_allow_html=True)
+
+    if combined_data.empty:
+        st.warning("No data available")
+        return
+
+    fig = _session_figure(
+        "price_history_fig", fig_key, lambda: _build_price_history_fig(combined_data, tickers)
+    )
     st.plotly_chart(fig, use_container_width=True)
 
 
-def plot_returns_distribution(dm, tickers):
+def _build_distribution_figs(returns, tickers):
+    """Build one histogram-with-normal-overlay figure per ticker."""
+    n_bins = 50
+    available = [t for t in tickers if t in returns.columns]
+    means = returns[available].mean()
+    stds = returns[available].std()
+    lows = returns[available].min()
+    highs = returns[available].max()
+    counts = returns[available].count()
+
+    figs = {}
+    for ticker in available:
+        # Pin the bin edges so the overlay can be scaled by the true bin width
+        bin_width = (highs[ticker] - lows[ticker]) / n_bins
+        fig = go.Figure()
+        fig.add_trace(
+            go.Histogram(
+                x=returns[ticker],
+                xbins=dict(start=lows[ticker], end=highs[ticker], size=bin_width),
+                name=ticker,
+                marker_color='rgba(102, 126, 234, 0.7)',
+                opacity=0.75,
+                hovertemplate="<b>Return Range</b><br>Count: %{y}<extra></extra>"
+            )
+        )
+        
+        # Add normal distribution overlay, scaled from density to bin counts
+        x_range = np.linspace(lows[ticker], highs[ticker], 100)
+        z = (x_range - means[ticker]) / stds[ticker]
+        pdf = np.exp(-0.5 * z * z) / (stds[ticker] * np.sqrt(2 * np.pi))
+        normal_dist = pdf * counts[ticker] * bin_width
+        
+        fig.add_trace(
+            go.Scatter(
+                x=x_range,
+                y=normal_dist,
+                name='Normal Distribution',
+                line=dict(color='red', width=2),
+                opacity=0.7,
+            )
+        )
+        
+        fig.update_layout(
+            title=f"{ticker} Returns Distribution",
+            xaxis_title="Daily Return",
+            yaxis_title="Frequency",
+            height=350,
+            template="plotly_white",
+            showlegend=True,
+        )
+        figs[ticker] = fig
+    return figs
+
+
+def plot_returns_distribution(returns, tickers, fig_key):
     """Plot distribution of returns."""
     st.markdown("<h2 class='section-header'>📊 Returns Distribution Analysis</h2>", unsafe_allow_html=True)
 
-    returns = dm.get_returns()
     if returns.empty:
         st.warning("No returns data available")
         return
 
+    figs = _session_figure(
+        "distribution_figs", fig_key, lambda: _build_distribution_figs(returns, tickers)
+    )
+
     cols = st.columns(min(2, len(tickers)))
     for idx, ticker in enumerate(tickers):
-        if ticker not in returns.columns:
+        if ticker not in figs:
             continue
 
         with cols[idx % 2]:
-            fig = go.Figure()
-            fig.add_trace(
-                go.Histogram(
-                    x=returns[ticker],
-                    nbinsx=50,
-                    name=ticker,
-                    marker_color='rgba(102, 126, 234, 0.7)',
-                    opacity=0.75,
-                    hovertemplate="<b>Return Range</b><br>Count: %{y}<extra></extra>"
-                )
-            )
-            
-            # Add normal distribution overlay
-            mean = returns[ticker].mean()
-            std = returns[ticker].std()
-            x_range = np.linspace(returns[ticker].min(), returns[ticker].max(), 100)
-            normal_dist = stats.norm.pdf(x_range, mean, std) * len(returns[ticker]) * (returns[ticker].max() - returns[ticker].min()) / 50
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=x_range,
-                    y=normal_dist,
-                    name='Normal Distribution',
-                    line=dict(color='red', width=2),
-                    opacity=0.7,
-                )
-            )
-            
-            fig.update_layout(
-                title=f"{ticker} Returns Distribution",
-                xaxis_title="Daily Return",
-                yaxis_title="Frequency",
-                height=350,
-                template="plotly_white",
-                showlegend=True,
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figs[ticker], use_container_width=True)
 
 
-def plot_correlation_heatmap(dm, tickers):
-    """Plot correlation matrix heatmap."""
-    st.markdown("<h2 class='section-header'>🔗 Correlation Matrix</h2>", unsafe_allow_html=True)
-
-    returns = dm.get_returns()
-    if returns.empty or len(returns.columns) < 2:
-        st.warning("Need at least 2 ETFs for correlation analysis")
-        return
-
-    corr_matrix = returns.corr()
+def _build_correlation_fig(returns):
+    """Build the correlation heatmap and return it with the pairwise correlations."""
+    # Returns are NaN-free here, so a single NumPy corrcoef replaces pandas' pairwise corr
+    corr_values_full = np.corrcoef(returns.to_numpy(), rowvar=False)
+    corr_matrix = pd.DataFrame(corr_values_full, index=returns.columns, columns=returns.columns)
 
     fig = go.Figure(
         data=go.Heatmap(
-            z=corr_matrix.values,
+            z=corr_values_full,
             x=corr_matrix.columns,
             y=corr_matrix.columns,
             colorscale="RdBu",
             zmid=0,
             zmin=-1,
             zmax=1,
-            text=np.round(corr_matrix.values, 2),
-            texttemplate="%{text}",
+            texttemplate="%{z:.2f}",
             textfont={"size": 11},
             hovertemplate="<b>%{x} vs %{y}</b><br>Correlation: %{z:.3f}<extra></extra>"
         )
@@ -307,15 +431,29 @@ def plot_correlation_heatmap(dm, tickers):
         height=450,
         template="plotly_white",
     )
+
+    # Get upper triangle to avoid duplicates
+    corr_values = corr_values_full[np.triu_indices_from(corr_values_full, k=1)]
+    return fig, corr_values
+
+
+def plot_correlation_heatmap(returns, tickers, fig_key):
+    """Plot correlation matrix heatmap."""
+    st.markdown("<h2 class='section-header'>🔗 Correlation Matrix</h2>", unsafe_allow_html=True)
+
+    if returns.empty or len(returns.columns) < 2:
+        st.warning("Need at least 2 ETFs for correlation analysis")
+        return
+
+    fig, corr_values = _session_figure(
+        "correlation_fig", fig_key, lambda: _build_correlation_fig(returns)
+    )
     st.plotly_chart(fig, use_container_width=True)
     
     # Correlation statistics
     st.markdown("### Correlation Statistics")
     col1, col2, col3 = st.columns(3)
     
-    # Get upper triangle to avoid duplicates
-    corr_values = corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)]
-    
     with col1:
         st.metric("Average Correlation", f"{corr_values.mean():.3f}")
     with col2:
@@ -324,16 +462,66 @@ def plot_correlation_heatmap(dm, tickers):
         st.metric("Min Correlation", f"{corr_values.min():.3f}")
 
 
-def portfolio_optimization_section(dm, tickers, risk_free_rate):
+def _build_frontier_fig(frontier, result):
+    """Build the efficient frontier figure with the selected portfolio marked."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=frontier["volatilities"] * 100,
+            y=frontier["returns"] * 100,
+            mode="markers",
+            marker=dict(
+                size=8,
+                color=frontier["sharpe_ratios"],
+                colorscale="Viridis",
+                showscale=True,
+                colorbar=dict(
+                    title="Sharpe<br>Ratio",
+                    thickness=15,
+                    len=0.7,
+                ),
+                line=dict(width=0.5, color="white"),
+            ),
+            customdata=np.asarray(frontier["sharpe_ratios"]),
+            hovertemplate="<b>Efficient Portfolio</b><br>Risk: %{x:.2f}%<br>Return: %{y:.2f}%<br>Sharpe: %{customdata:.2f}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=[result.volatility * 100],
+            y=[result.expected_return * 100],
+            mode="markers+text",
+            marker=dict(size=20, color="red", symbol="star", line=dict(width=2, color="white")),
+            text=["Selected"],
+            textposition="top center",
+            name="Selected Portfolio",
+            hovertemplate="<b>Your Portfolio</b><br>Risk: %{x:.2f}%<br>Return: %{y:.2f}%<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title="Efficient Frontier - Risk vs Return",
+        xaxis_title="Volatility (Risk) %",
+        yaxis_title="Expected Return %",
+        height=450,
+        hovermode="closest",
+        template="plotly_white",
+    )
+    return fig
+
+
+def portfolio_optimization_section(returns, tickers, risk_free_rate, fig_key):
     """Display portfolio optimization section."""
     st.markdown("<h2 class='section-header'>🎯 Portfolio Optimization</h2>", unsafe_allow_html=True)
 
-    returns = dm.get_returns()
     if returns.empty or len(returns.columns) < 2:
         st.warning("Need at least 2 ETFs for optimization")
         return
 
-    optimizer = PortfolioOptimizer(returns, risk_free_rate)
+    try:
+        optimizer = _cached_optimizer(returns, risk_free_rate)
+    except ValueError as e:
+        st.warning(f"Cannot optimize this selection: {e}. Try a longer date range or fewer ETFs.")
+        return
 
     # Strategy selection
     col1, col2, col3 = st.columns([2, 2, 2])
@@ -375,9 +563,8 @@ def portfolio_optimization_section(dm, tickers, risk_free_rate):
         )
         weights_df = weights_df[weights_df["Weight"] > 0.001].sort_values("Allocation %", ascending=False)
         
-        # Display as formatted table
-        display_df = weights_df.copy()
-        display_df["Allocation %"] = display_df["Allocation %"].apply(lambda x: f"{x:.2f}%")
+        # Display as formatted table; weights_df itself stays numeric for the pie chart
+        display_df = weights_df.assign(**{"Allocation %": weights_df["Allocation %"].map("{:.2f}%".format)})
         st.dataframe(display_df, use_container_width=True, hide_index=True)
 
     with col_metrics:
@@ -389,7 +576,7 @@ def portfolio_optimization_section(dm, tickers, risk_free_rate):
             st.metric("Volatility", f"{result.volatility * 100:.2f}%")
         with metric_col2:
             st.metric("Sharpe Ratio", f"{result.sharpe_ratio:.3f}")
-            effective_n = 1 / (result.weights ** 2).sum()
+            effective_n = MetricsCalculator.calculate_effective_n(result.weights)
             st.metric("Diversification", f"{effective_n:.2f} assets")
 
     # Allocation pie chart
@@ -397,8 +584,8 @@ def portfolio_optimization_section(dm, tickers, risk_free_rate):
     fig = go.Figure(
         data=[
             go.Pie(
-                labels=weights_df["ETF"],
-                values=weights_df["Allocation %"],
+                labels=weights_df["ETF"].to_numpy(),
+                values=weights_df["Allocation %"].to_numpy(),
                 hole=0.3,
                 textinfo="label+percent",
                 marker=dict(line=dict(color="white", width=2)),
@@ -418,50 +605,11 @@ def portfolio_optimization_section(dm, tickers, risk_free_rate):
     
     try:
         with st.spinner("🔄 Generating efficient frontier..."):
-            frontier = optimizer.generate_efficient_frontier(num_portfolios=100)
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=frontier["volatilities"] * 100,
-                y=frontier["returns"] * 100,
-                mode="markers",
-                marker=dict(
-                    size=8,
-                    color=frontier["sharpe_ratios"],
-                    colorscale="Viridis",
-                    showscale=True,
-                    colorbar=dict(
-                        title="Sharpe<br>Ratio",
-                        thickness=15,
-                        len=0.7,
-                    ),
-                    line=dict(width=0.5, color="white"),
-                ),
-                text=[f"Sharpe: {sr:.2f}" for sr in frontier["sharpe_ratios"]],
-                hovertemplate="<b>Efficient Portfolio</b><br>Risk: %{x:.2f}%<br>Return: %{y:.2f}%<br>%{text}<extra></extra>",
-            )
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=[result.volatility * 100],
-                y=[result.expected_return * 100],
-                mode="markers+text",
-                marker=dict(size=20, color="red", symbol="star", line=dict(width=2, color="white")),
-                text=["Selected"],
-                textposition="top center",
-                name="Selected Portfolio",
-                hovertemplate="<b>Your Portfolio</b><br>Risk: %{x:.2f}%<br>Return: %{y:.2f}%<extra></extra>",
+            fig = _session_figure(
+                "frontier_fig",
+                (fig_key, risk_free_rate, strategy),
+                lambda: _build_frontier_fig(_cached_frontier(returns, risk_free_rate, 100), result),
             )
-        )
-        fig.update_layout(
-            title="Efficient Frontier - Risk vs Return",
-            xaxis_title="Volatility (Risk) %",
-            yaxis_title="Expected Return %",
-            height=450,
-            hovermode="closest",
-            template="plotly_white",
-        )
         st.plotly_chart(fig, use_container_width=True)
     except Exception as e:
         st.error(f"Could not generate efficient frontier: {e}")
@@ -508,38 +656,50 @@ def main():
         st.info("Please check your internet connection and try again.")
         return
 
+    # Derive prices and returns once per rerun and share them across tabs
+    prices = dm.get_combined_data()
+    returns = dm.get_returns()
+    fig_key = (tuple(tickers), start_date, end_date)
+
     # Main content tabs
     tab1, tab2, tab3, tab4, tab5 = st.tabs(
         ["📊 Overview", "📈 Technical Analysis", "🔗 Correlation", "🎯 Optimization", "📋 Summary"]
     )
 
     with tab1:
-        display_performance_metrics(dm, tickers, risk_free_rate)
+        display_performance_metrics(prices, tickers, risk_free_rate)
         st.divider()
-        plot_price_history(dm, tickers)
+        plot_price_history(prices, tickers, fig_key)
 
     with tab2:
-        plot_returns_distribution(dm, tickers)
+        plot_returns_distribution(returns, tickers, fig_key)
         
         # Additional statistics
         st.markdown("<h2 class='section-header'>📉 Return Statistics</h2>", unsafe_allow_html=True)
-        returns = dm.get_returns()
         
-        stats_cols = st.columns(len([t for t in tickers if t in returns.columns]))
-        for idx, ticker in enumerate([t for t in tickers if t in returns.columns]):
-            with stats_cols[idx]:
-                st.markdown(f"### {ticker}")
-                ret = returns[ticker]
-                st.metric("Avg Daily Return", f"{ret.mean() * 100:.4f}%")
-                st.metric("Daily Volatility", f"{ret.std() * 100:.4f}%")
-                st.metric("Skewness", f"{ret.skew():.3f}")
-                st.metric("Kurtosis", f"{ret.kurtosis():.3f}")
+        available = [t for t in tickers if t in returns.columns]
+        if available:
+            stats_df = returns[available].agg(["mean", "std", "skew", "kurt"]).T
+            stats_df.columns = ["Avg Daily Return", "Daily Volatility", "Skewness", "Kurtosis"]
+            st.dataframe(
+                stats_df.style.format(
+                    {
+                        "Avg Daily Return": "{:.4%}",
+                        "Daily Volatility": "{:.4%}",
+                        "Skewness": "{:.3f}",
+                        "Kurtosis": "{:.3f}",
+                    }
+                ),
+                use_container_width=True,
+            )
+        else:
+            st.info("No return data available for the selected ETFs")
 
     with tab3:
-        plot_correlation_heatmap(dm, tickers)
+        plot_correlation_heatmap(returns, tickers, fig_key)
 
     with tab4:
-        portfolio_optimization_section(dm, tickers, risk_free_rate)
+        portfolio_optimization_section(returns, tickers, risk_free_rate, fig_key)
 
     with tab5:
         st.markdown("<h2 class='section-header'>📋 Analysis Summary</h2>", unsafe_allow_html=True)
@@ -550,13 +710,12 @@ def main():
             st.markdown("#### 📅 Analysis Period")
             st.write(f"**Start Date**: {start_date.strftime('%Y-%m-%d')}")
             st.write(f"**End Date**: {end_date.strftime('%Y-%m-%d')}")
-            trading_days = len(dm.get_returns())
-            st.write(f"**Trading Days**: {trading_days}")
+            st.write(f"**Trading Days**: {len(returns)}")
         
         with col2:
             st.markdown("#### 📊 Selected ETFs")
             for ticker in tickers:
-                if ticker in dm.data:
+                if ticker in prices.columns:
                     st.write(f"✓ {ticker}")
         
         st.divider()
@@ -564,7 +723,7 @@ def main():
         # Export data option
         st.markdown("#### 💾 Export Data")
         if st.button("📥 Download Analysis Data (CSV)"):
-            csv = dm.get_combined_data().to_csv()
+            csv = prices.to_csv()
             st.download_button(
                 label="Click to Download",
                 data=csv,
@@ -27,20 +27,20 @@ def example_basic_analysis():
     print(f"\nFetching data for: {tickers}")
     dm.fetch_data(tickers)
 
-    # Analyze each ETF
+    # Analyze all ETFs in one vectorized pass
     prices = dm.get_combined_data()
-    for ticker in tickers:
-        if ticker in prices.columns:
-            model = FinancialModel(prices[ticker], RISK_FREE_RATE)
-            metrics = model.calculate_metrics()
-
-            print(f"\n{ticker}:")
-            print(f"  Annual Return:    {metrics.annualized_return * 100:.2f}%")
-            print(f"  Volatility:       {metrics.annualized_volatility * 100:.2f}%")
-            print(f"  Sharpe Ratio:     {metrics.sharpe_ratio:.2f}")
-            print(f"  Sortino Ratio:    {metrics.sortino_ratio:.2f}")
-            print(f"  Max Drawdown:     {metrics.max_drawdown * 100:.2f}%")
-            print(f"  Cumulative Return: {metrics.cumulative_return * 100:.2f}%")
+    available = [ticker for ticker in tickers if ticker in prices.columns]
+    batch_metrics = FinancialModel.calculate_metrics_batch(prices[available], RISK_FREE_RATE)
+    for ticker in available:
+        metrics = batch_metrics.loc[ticker]
+
+        print(f"\n{ticker}:")
+        print(f"  Annual Return:    {metrics.annualized_return * 100:.2f}%")
+        print(f"  Volatility:       {metrics.annualized_volatility * 100:.2f}%")
+        print(f"  Sharpe Ratio:     {metrics.sharpe_ratio:.2f}")
+        print(f"  Sortino Ratio:    {metrics.sortino_ratio:.2f}")
+        print(f"  Max Drawdown:     {metrics.max_drawdown * 100:.2f}%")
+        print(f"  Cumulative Return: {metrics.cumulative_return * 100:.2f}%")
 
 
 def example_portfolio_analysis():
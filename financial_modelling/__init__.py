@@ -12,15 +12,29 @@ This package provides tools for:
 __version__ = "1.0.0"
 __author__ = "Financial Analytics Team"
 
-from .data_manager import DataManager
-from .models import FinancialModel, PortfolioModel
-from .metrics import MetricsCalculator
-from .optimization import PortfolioOptimizer
-
-__all__ = [
-    "DataManager",
-    "FinancialModel",
-    "PortfolioModel",
-    "MetricsCalculator",
-    "PortfolioOptimizer",
-]
+import importlib
+
+# Public classes and the submodule defining each. They are imported on first
+# access so that e.g. MetricsCalculator does not pull in yfinance or scipy.
+_EXPORTS = {
+    "DataManager": ".data_manager",
+    "FinancialModel": ".models",
+    "PortfolioModel": ".models",
+    "MetricsCalculator": ".metrics",
+    "PortfolioOptimizer": ".optimization",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import a public class from its submodule on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -10,10 +10,8 @@ DEFAULT_ETFS: List[str] = [
     "VGS.AX",  # Vanguard Global Shares
     "VGAD.AX",  # Vanguard Global Shares Hedged
     "VAP.AX",  # Vanguard Developed Markets Index
-    "VAS.AX",  # Vanguard Australian Shares
     "IVV.AX",  # iShares Core S&P 500 ETF
     "IVE.AX",  # iShares Global Ex-Australia ETF
-    "VAS.AX",  # Vanguard Australian Shares
     "DHHF.AX",  # Diversified High Yield Fund
     "VDHG.AX",  # Vanguard Diversified High Growth ETF
 ]
@@ -2,14 +2,44 @@
 Data management module for fetching and managing ETF data.
 """
 
+import functools
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yfinance as yf
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import os
 import json
 
 
+@functools.lru_cache(maxsize=256)
+def _fetch_info(ticker: str) -> Dict:
+    """Fetch ticker metadata from Yahoo Finance once per process."""
+    info = yf.Ticker(ticker).info
+    # Raise rather than return, so lru_cache doesn't keep an empty or stub
+    # response and the next call retries
+    if not info or "longName" not in info:
+        raise ValueError(f"No info returned for {ticker}")
+    return info
+
+
+# Parsed parquet tables by path, with the mtime they were read at; shared
+# across DataManager instances so the app's per-rerun managers reuse them
+_parquet_tables: Dict[str, Tuple[float, pa.Table]] = {}
+
+
+def _read_parquet(path: str) -> pd.DataFrame:
+    """Read a parquet file, reusing the parsed table until the file changes."""
+    mtime = os.path.getmtime(path)
+    cached = _parquet_tables.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pq.read_table(path))
+        _parquet_tables[path] = cached
+    return cached[1].to_pandas()
+
+
 class DataManager:
     """Manages ETF data collection, storage, and retrieval."""
 
@@ -22,6 +52,7 @@ class DataManager:
         """
         self.cache_dir = cache_dir
         self.data: Dict[str, pd.DataFrame] = {}
+        self._combined: Optional[pd.DataFrame] = None
         self._ensure_cache_dir()
 
     def _ensure_cache_dir(self) -> None:
@@ -52,43 +83,93 @@ class DataManager:
         Returns:
             Dictionary of ticker -> DataFrame with price data
         """
+        tickers = list(dict.fromkeys(tickers))
         if end_date is None:
             end_date = datetime.now().strftime("%Y-%m-%d")
         if start_date is None:
             start_date = (datetime.now() - timedelta(days=365*5)).strftime("%Y-%m-%d")
 
         results = {}
+        uncached = []
         for ticker in tickers:
             cache_path = self._get_cache_path(ticker, start_date, end_date)
 
             # Check cache
             if use_cache and os.path.exists(cache_path):
-                results[ticker] = pd.read_parquet(cache_path)
-                continue
+                results[ticker] = _read_parquet(cache_path)
+            else:
+                uncached.append(ticker)
+
+        if uncached:
+            results.update(self._download(uncached, start_date, end_date))
+            results = {ticker: results[ticker] for ticker in tickers if ticker in results}
+
+        self.data.update(results)
+        self._combined = None
+        return results
+
+    def _download(
+        self, tickers: List[str], start_date: str, end_date: str
+    ) -> Dict[str, pd.DataFrame]:
+        """Download tickers in one batched Yahoo Finance request and cache each."""
+        try:
+            raw = yf.download(
+                tickers,
+                start=start_date,
+                end=end_date,
+                group_by="ticker",
+                threads=True,
+                progress=False,
+            )
+        except Exception as e:
+            print(f"Error fetching {', '.join(tickers)}: {e}")
+            return {}
 
-            # Download data
-            try:
-                df = yf.download(ticker, start=start_date, end=end_date, progress=False)
-                if df.empty:
+        results = {}
+        for ticker in tickers:
+            # Older yfinance versions return flat columns for a single ticker
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
                     print(f"Warning: No data found for {ticker}")
                     continue
+                frame = raw[ticker]
+            else:
+                frame = raw
 
-                df = df[["Close"]].rename(columns={"Close": ticker})
-                results[ticker] = df
+            df = frame[["Close"]].dropna().rename(columns={"Close": ticker})
+            if df.empty:
+                print(f"Warning: No data found for {ticker}")
+                continue
+            results[ticker] = df
 
-                # Cache the data
-                df.to_parquet(cache_path)
-            except Exception as e:
-                print(f"Error fetching {ticker}: {e}")
+            # Cache the data
+            cache_path = self._get_cache_path(ticker, start_date, end_date)
+            pq.write_table(pa.Table.from_pandas(df), cache_path, compression="zstd")
 
-        self.data.update(results)
         return results
 
     def get_combined_data(self) -> pd.DataFrame:
-        """Get all loaded data as a combined DataFrame."""
+        """Get all loaded data as a combined DataFrame (cached until the next fetch)."""
         if not self.data:
             return pd.DataFrame()
-        return pd.concat(self.data.values(), axis=1)
+        if self._combined is None:
+            self._combined = self._combine(list(self.data.values()))
+        return self._combined
+
+    @staticmethod
+    def _combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Outer-join price frames on their dates into one preallocated block."""
+        index = functools.reduce(lambda a, b: a.union(b), (df.index for df in frames))
+        columns = [column for df in frames for column in df.columns]
+        values = np.full((len(index), len(columns)), np.nan)
+
+        start = 0
+        for df in frames:
+            stop = start + df.shape[1]
+            values[index.get_indexer(df.index), start:stop] = df.to_numpy(dtype=np.float64)
+            start = stop
+
+        return pd.DataFrame(values, index=index, columns=columns)
 
     def get_returns(self, method: str = "log") -> pd.DataFrame:
         """
@@ -105,7 +186,7 @@ class DataManager:
             return pd.DataFrame()
 
         if method == "log":
-            returns = combined.pct_change().apply(lambda x: (1 + x).apply(__import__('numpy').log))
+            returns = np.log(combined).diff()
         else:
             returns = combined.pct_change()
 
@@ -114,7 +195,7 @@ class DataManager:
     def get_info(self, ticker: str) -> Dict:
         """Get ETF information."""
         try:
-            info = yf.Ticker(ticker).info
+            info = _fetch_info(ticker)
             return {
                 "name": info.get("longName", "N/A"),
                 "sector": info.get("sector", "N/A"),
@@ -131,6 +212,10 @@ class DataManager:
         if os.path.exists(self.cache_dir):
             shutil.rmtree(self.cache_dir)
         self._ensure_cache_dir()
+        cache_dir = os.path.normpath(self.cache_dir)
+        for path in [p for p in _parquet_tables if os.path.dirname(p) == cache_dir]:
+            del _parquet_tables[path]
+        self._combined = None
 
     def export_data(self, filepath: str) -> None:
         """Export combined data to CSV."""
@@ -4,9 +4,45 @@ Metrics calculation module for detailed financial analysis.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Union
 from datetime import datetime, timedelta
 
+# Shared PCG64 generator for simulations; lock-free unlike the legacy global state
+_rng = np.random.default_rng()
+
+
+def _central_moments(values: np.ndarray) -> Tuple[int, float, float, float]:
+    """
+    Compute sample size and 2nd-4th central moments in one pass over the data.
+
+    NaNs are skipped, matching pandas' reductions.
+    """
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        return 0, np.nan, np.nan, np.nan
+    dev = values - values.mean()
+    dev2 = dev * dev
+    return n, dev2.mean(), (dev2 * dev).mean(), (dev2 * dev2).mean()
+
+
+def _tail_risk(values: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """
+    Compute VaR and CVaR of a sample from a single partition.
+
+    VaR is the linearly interpolated percentile (as np.percentile) and CVaR is
+    the mean of the observations at or below it, read from the contiguous
+    partitioned tail instead of a boolean mask.
+    """
+    n = values.size
+    position = (1 - confidence) * (n - 1)
+    lo = int(np.floor(position))
+    hi = min(lo + 1, n - 1)
+    partitioned = np.partition(values, [lo, hi])
+    var = partitioned[lo] + (partitioned[hi] - partitioned[lo]) * (position - lo)
+    tail_size = hi + 1 if partitioned[hi] <= var else lo + 1
+    return var, partitioned[:tail_size].mean()
+
 
 class MetricsCalculator:
     """Calculate comprehensive financial metrics."""
@@ -44,17 +80,28 @@ class MetricsCalculator:
         return returns.std() * np.sqrt(periods_per_year)
 
     @staticmethod
-    def calculate_skewness(returns: pd.Series) -> float:
-        """Calculate skewness of returns."""
-        return returns.skew()
+    def calculate_skewness(returns: Union[pd.Series, np.ndarray]) -> float:
+        """Calculate skewness of returns (bias-adjusted, same as pandas)."""
+        n, m2, m3, _ = _central_moments(np.asarray(returns, dtype=np.float64))
+        if n < 3:
+            return np.nan
+        if m2 == 0:
+            return 0.0
+        return float(np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5)
 
     @staticmethod
-    def calculate_kurtosis(returns: pd.Series) -> float:
-        """Calculate kurtosis of returns."""
-        return returns.kurtosis()
+    def calculate_kurtosis(returns: Union[pd.Series, np.ndarray]) -> float:
+        """Calculate excess kurtosis of returns (bias-adjusted, same as pandas)."""
+        n, m2, _, m4 = _central_moments(np.asarray(returns, dtype=np.float64))
+        if n < 4:
+            return np.nan
+        if m2 == 0:
+            return 0.0
+        adj = (n - 1) / ((n - 2) * (n - 3))
+        return float(adj * ((n + 1) * m4 / m2 ** 2 - 3 * (n - 1)))
 
     @staticmethod
-    def calculate_win_rate(returns: pd.Series) -> float:
+    def calculate_win_rate(returns: Union[pd.Series, np.ndarray]) -> float:
         """Calculate percentage of positive returns."""
         if len(returns) == 0:
             return 0
@@ -131,17 +178,14 @@ class MetricsCalculator:
         Returns:
             Tuple of (VaR, CVaR)
         """
-        mean = returns.mean()
-        std = returns.std()
-
-        # Generate random returns
-        simulated_returns = np.random.normal(mean, std, simulations)
+        mean = np.float32(returns.mean())
+        std = np.float32(returns.std())
 
-        # Calculate VaR and CVaR
-        var = np.percentile(simulated_returns, (1 - confidence) * 100)
-        cvar = simulated_returns[simulated_returns <= var].mean()
+        # Single precision is ample next to the ~1/sqrt(simulations) sampling error
+        simulated_returns = mean + std * _rng.standard_normal(simulations, dtype=np.float32)
 
-        return var, cvar
+        var, cvar = _tail_risk(simulated_returns, confidence)
+        return float(var), float(cvar)
 
     @staticmethod
     def calculate_rolling_metrics(
@@ -161,9 +205,7 @@ class MetricsCalculator:
             "volatility": returns.rolling(window).std() * np.sqrt(252),
             "return": returns.rolling(window).mean() * 252,
             "skewness": returns.rolling(window).skew(),
-            "kurtosis": returns.rolling(window).apply(
-                lambda x: x.kurtosis() if len(x) > 0 else np.nan
-            ),
+            "kurtosis": returns.rolling(window).kurt(),
         }
 
     @staticmethod
@@ -206,10 +248,20 @@ class MetricsCalculator:
         Returns:
             Dictionary of stress metrics
         """
-        worst_returns = returns.nsmallest(int(len(returns) * percentile / 100))
+        k = int(len(returns) * percentile / 100)
+        values = np.asarray(returns, dtype=np.float64)
+        values = values[~np.isnan(values)]
+
+        # Partition out only the tail we need (O(n)) rather than sorting everything
+        m = min(max(k, 10), values.size)
+        worst = np.sort(np.partition(values, m - 1)[:m]) if m > 0 else values
+
+        def tail_mean(count: int) -> float:
+            return worst[:count].mean() if count > 0 and worst.size > 0 else np.nan
+
         return {
-            "worst_return": worst_returns.min(),
-            "avg_worst_return": worst_returns.mean(),
-            "worst_5_return": returns.nsmallest(5).mean(),
-            "worst_10_return": returns.nsmallest(10).mean(),
+            "worst_return": worst[0] if k > 0 and worst.size > 0 else np.nan,
+            "avg_worst_return": tail_mean(k),
+            "worst_5_return": tail_mean(5),
+            "worst_10_return": tail_mean(10),
         }
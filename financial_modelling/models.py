@@ -5,9 +5,11 @@ Financial models for analyzing ETF performance.
 import numpy as np
 import pandas as pd
 from typing import Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 
+from .metrics import _tail_risk
+
 
 @dataclass
 class FinancialMetrics:
@@ -35,6 +37,18 @@ class FinancialModel:
         self.risk_free_rate = risk_free_rate
         self.returns = prices.pct_change().dropna()
 
+        # Scalars shared by the return-based ratios, read once instead of per call
+        self._prices_arr = prices.to_numpy(dtype=np.float64)
+        self._returns_arr = self.returns.to_numpy(dtype=np.float64)
+        self._years = len(self._prices_arr) / 252
+        if self._years:
+            self._p0 = self._prices_arr[0]
+            self._pN = self._prices_arr[-1]
+            self._ann_return = (self._pN / self._p0) ** (1 / self._years) - 1
+        else:
+            self._p0 = self._pN = np.nan
+            self._ann_return = 0
+
     def calculate_metrics(self) -> FinancialMetrics:
         """Calculate key financial metrics."""
         ann_return = self.calculate_annualized_return()
@@ -53,17 +67,65 @@ class FinancialModel:
             cumulative_return=cum_return,
         )
 
+    @staticmethod
+    def calculate_metrics_batch(prices: pd.DataFrame, risk_free_rate: float = 0.04) -> pd.DataFrame:
+        """
+        Calculate key financial metrics for every column of a price frame at once.
+
+        Equivalent to calling calculate_metrics() on each column, but computed
+        with column-wise vectorized reductions. NaNs are ignored per column, as if
+        each column were passed on its own with its gaps dropped: leading NaNs
+        (a fund that listed later) and interior gaps (dates another fund traded
+        on) do not break the return series.
+
+        Args:
+            prices: DataFrame of prices, one column per asset
+            risk_free_rate: Risk-free rate for Sharpe ratio calculation
+
+        Returns:
+            DataFrame indexed by asset with one column per FinancialMetrics field
+        """
+        if prices.empty:
+            return pd.DataFrame(columns=[f.name for f in fields(FinancialMetrics)], dtype=float)
+
+        # Each return spans back to the column's previous valid price, so a gap
+        # left by the union-joined index does not drop the move across it
+        returns = (prices / prices.ffill().shift(1) - 1).where(prices.notna())
+        counts = prices.count()
+        first = prices.bfill().iloc[0]
+        last = prices.ffill().iloc[-1]
+
+        years = counts / 252
+        ann_return = ((last / first) ** (1 / years.where(years != 0)) - 1).fillna(0)
+        ann_volatility = returns.std() * np.sqrt(252)
+        downside_volatility = returns.where(returns < 0).std() * np.sqrt(252)
+
+        sharpe = ((ann_return - risk_free_rate) / ann_volatility).where(ann_volatility != 0, 0)
+        sortino = (ann_return / downside_volatility).where(downside_volatility != 0, 0)
+
+        cumulative = (1 + returns).cumprod()
+        max_drawdown = (cumulative / cumulative.cummax() - 1).min()
+
+        return pd.DataFrame(
+            {
+                "annualized_return": ann_return,
+                "annualized_volatility": ann_volatility,
+                "sharpe_ratio": sharpe,
+                "sortino_ratio": sortino,
+                "max_drawdown": max_drawdown,
+                "cumulative_return": cumulative.ffill().iloc[-1] - 1,
+            }
+        )
+
     def calculate_annualized_return(self) -> float:
         """Calculate annualized return."""
-        total_return = (self.prices.iloc[-1] / self.prices.iloc[0]) - 1
-        years = len(self.prices) / 252
-        if years == 0:
-            return 0
-        return (1 + total_return) ** (1 / years) - 1
+        return self._ann_return
 
     def calculate_annualized_volatility(self) -> float:
         """Calculate annualized volatility (standard deviation)."""
-        return self.returns.std() * np.sqrt(252)
+        if self._returns_arr.size < 2:
+            return np.nan
+        return self._returns_arr.std(ddof=1) * np.sqrt(252)
 
     def calculate_sharpe_ratio(
         self, annualized_return: Optional[float] = None, volatility: Optional[float] = None
@@ -78,12 +140,6 @@ class FinancialModel:
         if volatility is None:
             volatility = self.calculate_annualized_volatility()
 
-        # Handle Series case
-        if isinstance(volatility, pd.Series):
-            volatility = volatility.iloc[0] if len(volatility) > 0 else 0
-        if isinstance(annualized_return, pd.Series):
-            annualized_return = annualized_return.iloc[0] if len(annualized_return) > 0 else 0
-            
         if volatility == 0:
             return 0
         return (annualized_return - self.risk_free_rate) / volatility
@@ -98,17 +154,12 @@ class FinancialModel:
         """
         if annualized_return is None:
             annualized_return = self.calculate_annualized_return()
-        
-        # Handle Series case
-        if isinstance(annualized_return, pd.Series):
-            annualized_return = annualized_return.iloc[0] if len(annualized_return) > 0 else 0
-
-        downside_returns = self.returns[self.returns < target_return]
-        downside_volatility = downside_returns.std() * np.sqrt(252)
-        
-        # Handle Series case
-        if isinstance(downside_volatility, pd.Series):
-            downside_volatility = downside_volatility.iloc[0] if len(downside_volatility) > 0 else 0
+
+        downside_returns = self._returns_arr[self._returns_arr < target_return]
+        if downside_returns.size > 1:
+            downside_volatility = downside_returns.std(ddof=1) * np.sqrt(252)
+        else:
+            downside_volatility = 0.0
 
         if downside_volatility == 0:
             return 0
@@ -116,20 +167,25 @@ class FinancialModel:
 
     def calculate_max_drawdown(self) -> float:
         """Calculate maximum drawdown from peak to trough."""
-        cumulative = (1 + self.returns).cumprod()
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        return drawdown.min()
+        cumulative = np.cumprod(1.0 + self.returns.values)
+        if cumulative.size == 0:
+            return np.nan
+        running_max = np.maximum.accumulate(cumulative)
+        return float(((cumulative - running_max) / running_max).min())
 
     def calculate_rolling_volatility(self, window: int = 30) -> pd.Series:
         """Calculate rolling volatility."""
         return self.returns.rolling(window=window).std() * np.sqrt(252)
 
     def calculate_rolling_return(self, window: int = 252) -> pd.Series:
-        """Calculate rolling annualized return."""
-        return self.returns.rolling(window=window).apply(
-            lambda x: (1 + x).prod() ** (252 / len(x)) - 1
-        )
+        """
+        Calculate rolling annualized return.
+
+        Compounds each window via a rolling sum of log returns; windows with
+        fewer than `window` observations are NaN.
+        """
+        log_returns = np.log1p(self.returns)
+        return np.expm1(log_returns.rolling(window=window).sum() * (252 / window))
 
 
 class PortfolioModel:
@@ -153,6 +209,43 @@ class PortfolioModel:
             weights = pd.Series(1 / len(returns.columns), index=returns.columns)
         self.weights = weights
 
+    @property
+    def returns(self) -> pd.DataFrame:
+        """Asset returns the portfolio is evaluated on."""
+        return self._returns
+
+    @returns.setter
+    def returns(self, returns: pd.DataFrame) -> None:
+        """Replace the returns and drop everything derived from them."""
+        self._returns = returns
+        # Missing returns count as zero, matching a NaN-skipping row sum
+        self._returns_matrix = np.nan_to_num(returns.to_numpy(dtype=np.float64), nan=0.0)
+        self._portfolio_returns_cache: Optional[Tuple[bytes, pd.Series]] = None
+        self._cov: Optional[pd.DataFrame] = None
+        self._corr: Optional[pd.DataFrame] = None
+
+    def _get_cov(self) -> pd.DataFrame:
+        """Annualized covariance matrix, computed on first use."""
+        if self._cov is None:
+            self._cov = self.returns.cov() * 252
+        return self._cov
+
+    def _get_corr(self) -> pd.DataFrame:
+        """Correlation matrix, computed on first use."""
+        if self._corr is None:
+            self._corr = self.returns.corr()
+        return self._corr
+
+    def _portfolio_returns(self) -> pd.Series:
+        """Weighted portfolio return series, reused while the weights are unchanged."""
+        key = np.asarray(self.weights.values, dtype=np.float64).tobytes()
+        if self._portfolio_returns_cache is None or self._portfolio_returns_cache[0] != key:
+            portfolio_returns = pd.Series(
+                self._returns_matrix @ self.weights.values, index=self.returns.index
+            )
+            self._portfolio_returns_cache = (key, portfolio_returns)
+        return self._portfolio_returns_cache[1]
+
     def set_weights(self, weights: pd.Series) -> None:
         """Set portfolio weights."""
         if not np.isclose(weights.sum(), 1.0):
@@ -165,8 +258,8 @@ class PortfolioModel:
 
     def calculate_portfolio_volatility(self) -> float:
         """Calculate portfolio volatility."""
-        cov_matrix = self.returns.cov() * 252
-        portfolio_var = np.dot(self.weights.values, np.dot(cov_matrix, self.weights.values))
+        weights = self.weights.values
+        portfolio_var = weights @ self._get_cov().values @ weights
         return np.sqrt(portfolio_var)
 
     def calculate_portfolio_sharpe(self) -> float:
@@ -179,11 +272,11 @@ class PortfolioModel:
 
     def calculate_correlation_matrix(self) -> pd.DataFrame:
         """Get correlation matrix of returns."""
-        return self.returns.corr()
+        return self._get_corr().copy()
 
     def calculate_covariance_matrix(self) -> pd.DataFrame:
         """Get covariance matrix of returns."""
-        return self.returns.cov() * 252
+        return self._get_cov().copy()
 
     def calculate_var(self, confidence: float = 0.95) -> float:
         """
@@ -195,8 +288,7 @@ class PortfolioModel:
         Returns:
             VaR as percentage
         """
-        portfolio_returns = (self.returns * self.weights.values).sum(axis=1)
-        return np.percentile(portfolio_returns, (1 - confidence) * 100)
+        return np.percentile(self._portfolio_returns(), (1 - confidence) * 100)
 
     def calculate_cvar(self, confidence: float = 0.95) -> float:
         """
@@ -208,14 +300,12 @@ class PortfolioModel:
         Returns:
             CVaR as percentage
         """
-        portfolio_returns = (self.returns * self.weights.values).sum(axis=1)
-        var = np.percentile(portfolio_returns, (1 - confidence) * 100)
-        return portfolio_returns[portfolio_returns <= var].mean()
+        _, cvar = _tail_risk(self._portfolio_returns().values, confidence)
+        return cvar
 
     def calculate_beta(self, market_returns: pd.Series) -> float:
         """Calculate portfolio beta relative to market."""
-        portfolio_returns = (self.returns * self.weights.values).sum(axis=1)
-        covariance = portfolio_returns.cov(market_returns)
+        covariance = self._portfolio_returns().cov(market_returns)
         market_variance = market_returns.var()
         if market_variance == 0:
             return 0
@@ -4,6 +4,7 @@ Portfolio optimization module using various algorithms.
 
 import numpy as np
 import pandas as pd
+from scipy.linalg import cho_factor, cho_solve
 from scipy.optimize import minimize
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -32,19 +33,127 @@ class PortfolioOptimizer:
         Initialize PortfolioOptimizer.
 
         Args:
-            returns: DataFrame of returns for assets
+            returns: DataFrame of returns for assets (without missing values)
             risk_free_rate: Risk-free rate
             min_weight: Minimum weight per asset
             max_weight: Maximum weight per asset
+
+        Raises:
+            ValueError: If assets are duplicated or the covariance matrix is singular
         """
+        if not returns.columns.is_unique:
+            raise ValueError("Returns contain duplicate asset columns")
+
         self.returns = returns
         self.risk_free_rate = risk_free_rate
         self.min_weight = min_weight
         self.max_weight = max_weight
-        self.expected_returns = returns.mean() * 252
-        self.cov_matrix = returns.cov() * 252
         self.assets = returns.columns.tolist()
 
+        # Estimate moments with NumPy in float64 (even if returns are stored at
+        # lower precision); the objective functions use these arrays directly
+        values = np.ascontiguousarray(returns.to_numpy(), dtype=np.float64)
+        self._mu = values.mean(axis=0) * 252
+        self._sigma = np.cov(values, rowvar=False).reshape(len(self.assets), -1) * 252
+        self.expected_returns = pd.Series(self._mu, index=self.assets)
+        self.cov_matrix = pd.DataFrame(self._sigma, index=self.assets, columns=self.assets)
+        if np.linalg.matrix_rank(self._sigma) < len(self.assets):
+            raise ValueError("Covariance matrix is singular; assets are linearly dependent")
+        self._cov_factor = None
+        self._minvar_seed = None
+        self._frontier_cache = None
+
+    def _get_cov_factor(self) -> Tuple[np.ndarray, bool]:
+        """Cholesky factor of the covariance matrix, computed on first use."""
+        if self._cov_factor is None:
+            jitter = 1e-10 * np.eye(len(self.assets))
+            self._cov_factor = cho_factor(self._sigma + jitter)
+        return self._cov_factor
+
+    def _get_minvar_seed(self) -> np.ndarray:
+        """
+        Long-only approximation of the minimum-variance weights.
+
+        Used as the SLSQP starting point: the unconstrained solution S^-1 1 with
+        negative weights clipped to zero, renormalized to sum to one. Falls back
+        to equal weights if the covariance matrix cannot be factored.
+        """
+        if self._minvar_seed is None:
+            n_assets = len(self.assets)
+            try:
+                seed = np.clip(cho_solve(self._get_cov_factor(), np.ones(n_assets)), 0, None)
+                seed = seed / seed.sum()
+            except np.linalg.LinAlgError:
+                seed = np.array([1 / n_assets] * n_assets)
+            self._minvar_seed = seed
+        return self._minvar_seed
+
+    def _frontier_terms(self) -> Tuple[np.ndarray, np.ndarray, float, float, float]:
+        """
+        Closed-form frontier building blocks, computed on first use.
+
+        Returns:
+            Tuple of (S^-1 mu, S^-1 1, a, b, c) with a = mu'S^-1 mu,
+            b = mu'S^-1 1 and c = 1'S^-1 1
+        """
+        if self._frontier_cache is None:
+            ones = np.ones(len(self.assets))
+            inv_mu, inv_ones = cho_solve(
+                self._get_cov_factor(), np.column_stack([self._mu, ones])
+            ).T
+            self._frontier_cache = (
+                inv_mu,
+                inv_ones,
+                self._mu @ inv_mu,
+                self._mu @ inv_ones,
+                ones @ inv_ones,
+            )
+        return self._frontier_cache
+
+    def _within_bounds(self, weights: np.ndarray) -> bool:
+        """Check weights respect the per-asset bounds (up to rounding)."""
+        tol = 1e-10
+        return bool(
+            np.all(weights >= self.min_weight - tol) and np.all(weights <= self.max_weight + tol)
+        )
+
+    def _analytic_min_volatility(self) -> Optional[np.ndarray]:
+        """Global minimum-variance weights S^-1 1 / c, or None if a bound binds."""
+        _, inv_ones, _, _, c = self._frontier_terms()
+        weights = inv_ones / c
+        return weights if self._within_bounds(weights) else None
+
+    def _analytic_max_sharpe(self) -> Optional[np.ndarray]:
+        """Tangency weights proportional to S^-1 (mu - rf), or None if a bound binds."""
+        inv_mu, inv_ones, _, _, _ = self._frontier_terms()
+        direction = inv_mu - self.risk_free_rate * inv_ones
+        if direction.sum() <= 0:
+            return None
+        weights = direction / direction.sum()
+        return weights if self._within_bounds(weights) else None
+
+    def _analytic_target_return(self, target_return: float) -> Optional[np.ndarray]:
+        """
+        Minimum-variance weights for a target return from the KKT conditions.
+
+        The optimum is w = l*S^-1 1 + g*S^-1 mu where [c b; b a][l; g] = [1; r].
+        Returns None if a bound binds.
+        """
+        inv_mu, inv_ones, a, b, c = self._frontier_terms()
+        lam, gamma = np.linalg.solve([[c, b], [b, a]], [1.0, target_return])
+        weights = lam * inv_ones + gamma * inv_mu
+        return weights if self._within_bounds(weights) else None
+
+    def _build_result(self, weights: np.ndarray) -> OptimizationResult:
+        """Wrap weights with their portfolio metrics."""
+        ret, vol, sharpe = self._calculate_portfolio_metrics(weights)
+        return OptimizationResult(
+            weights=pd.Series(weights, index=self.assets),
+            expected_return=ret,
+            volatility=vol,
+            sharpe_ratio=sharpe,
+        )
+
     def _calculate_portfolio_metrics(
         self, weights: np.ndarray
     ) -> Tuple[float, float, float]:
@@ -54,8 +163,8 @@ class PortfolioOptimizer:
         Returns:
             Tuple of (return, volatility, sharpe_ratio)
         """
-        portfolio_return = np.sum(self.expected_returns.values * weights)
-        portfolio_variance = np.dot(weights, np.dot(self.cov_matrix.values, weights))
+        portfolio_return = self._mu @ weights
+        portfolio_variance = weights @ self._sigma @ weights
         portfolio_volatility = np.sqrt(portfolio_variance)
         sharpe_ratio = (portfolio_return - self.risk_free_rate) / portfolio_volatility
         return portfolio_return, portfolio_volatility, sharpe_ratio
@@ -67,13 +176,27 @@ class PortfolioOptimizer:
 
     def _portfolio_volatility(self, weights: np.ndarray) -> float:
         """Objective function: portfolio volatility."""
-        _, volatility, _ = self._calculate_portfolio_metrics(weights)
-        return volatility
+        return np.sqrt(weights @ self._sigma @ weights)
 
     def _negative_return(self, weights: np.ndarray) -> float:
         """Objective function: negative return (for minimization)."""
-        return_val, _, _ = self._calculate_portfolio_metrics(weights)
-        return -return_val
+        return -(self._mu @ weights)
+
+    def _negative_sharpe_jac(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of the negative Sharpe ratio."""
+        sigma_w = self._sigma @ weights
+        volatility = np.sqrt(weights @ sigma_w)
+        excess_return = self._mu @ weights - self.risk_free_rate
+        return -self._mu / volatility + excess_return * sigma_w / volatility ** 3
+
+    def _portfolio_volatility_jac(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of the portfolio volatility."""
+        sigma_w = self._sigma @ weights
+        return sigma_w / np.sqrt(weights @ sigma_w)
+
+    def _negative_return_jac(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of the negative portfolio return."""
+        return -self._mu
 
     def optimize_max_sharpe(self) -> OptimizationResult:
         """
@@ -82,25 +205,45 @@ class PortfolioOptimizer:
         Returns:
             OptimizationResult with optimal weights
         """
+        # Closed form when no weight bound binds; SLSQP otherwise
+        analytic = self._analytic_max_sharpe()
+        if analytic is not None:
+            return self._build_result(analytic)
+
         n_assets = len(self.assets)
-        initial_weights = np.array([1 / n_assets] * n_assets)
+        starts = [self._get_minvar_seed()]
+        # When even the min-variance portfolio earns less than the risk-free rate
+        # the Sharpe surface is not concave and SLSQP can stall at a poor corner
+        # from that seed, so also start from equal weights and keep the best
+        below_rf = self._mu @ starts[0] < self.risk_free_rate
+        if below_rf:
+            starts.append(np.ones(n_assets) / n_assets)
 
         bounds = tuple((self.min_weight, self.max_weight) for _ in range(n_assets))
-        constraints = {"type": "eq", "fun": lambda x: np.sum(x) - 1}
-
-        result = minimize(
-            self._negative_sharpe,
-            initial_weights,
-            method="SLSQP",
-            bounds=bounds,
-            constraints=constraints,
-            options={"ftol": 1e-9},
-        )
-
-        weights = pd.Series(result.x, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(result.x)
+        constraints = {
+            "type": "eq",
+            "fun": lambda x: np.sum(x) - 1,
+            "jac": lambda x: np.ones_like(x),
+        }
 
-        return OptimizationResult(weights=weights, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
+        candidates = []
+        for initial_weights in starts:
+            result = minimize(
+                self._negative_sharpe,
+                initial_weights,
+                jac=self._negative_sharpe_jac,
+                method="SLSQP",
+                bounds=bounds,
+                constraints=constraints,
+                options={"ftol": 1e-9, "maxiter": 200},
+            )
+            candidates.append(result.x)
+
+        # Single-asset portfolios are feasible corners whenever the bounds allow them
+        if below_rf and self.min_weight <= 0 and self.max_weight >= 1:
+            candidates.extend(np.eye(n_assets))
+
+        return self._build_result(min(candidates, key=self._negative_sharpe))
 
     def optimize_min_volatility(self) -> OptimizationResult:
         """
@@ -109,25 +252,32 @@ class PortfolioOptimizer:
         Returns:
             OptimizationResult with optimal weights
         """
+        # Closed form when no weight bound binds; SLSQP otherwise
+        analytic = self._analytic_min_volatility()
+        if analytic is not None:
+            return self._build_result(analytic)
+
         n_assets = len(self.assets)
-        initial_weights = np.array([1 / n_assets] * n_assets)
+        initial_weights = self._get_minvar_seed()
 
         bounds = tuple((self.min_weight, self.max_weight) for _ in range(n_assets))
-        constraints = {"type": "eq", "fun": lambda x: np.sum(x) - 1}
+        constraints = {
+            "type": "eq",
+            "fun": lambda x: np.sum(x) - 1,
+            "jac": lambda x: np.ones_like(x),
+        }
 
         result = minimize(
             self._portfolio_volatility,
             initial_weights,
+            jac=self._portfolio_volatility_jac,
             method="SLSQP",
             bounds=bounds,
             constraints=constraints,
-            options={"ftol": 1e-9},
+            options={"ftol": 1e-9, "maxiter": 200},
         )
 
-        weights = pd.Series(result.x, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(result.x)
-
-        return OptimizationResult(weights=weights, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
+        return self._build_result(result.x)
 
     def optimize_max_return(self) -> OptimizationResult:
         """
@@ -140,57 +290,66 @@ class PortfolioOptimizer:
         initial_weights = np.array([1 / n_assets] * n_assets)
 
         bounds = tuple((self.min_weight, self.max_weight) for _ in range(n_assets))
-        constraints = {"type": "eq", "fun": lambda x: np.sum(x) - 1}
+        constraints = {
+            "type": "eq",
+            "fun": lambda x: np.sum(x) - 1,
+            "jac": lambda x: np.ones_like(x),
+        }
 
         result = minimize(
             self._negative_return,
             initial_weights,
+            jac=self._negative_return_jac,
             method="SLSQP",
             bounds=bounds,
             constraints=constraints,
             options={"ftol": 1e-9},
         )
 
-        weights = pd.Series(result.x, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(result.x)
+        return self._build_result(result.x)
 
-        return OptimizationResult(weights=weights, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
-
-    def optimize_target_return(self, target_return: float) -> OptimizationResult:
+    def optimize_target_return(
+        self, target_return: float, x0: Optional[np.ndarray] = None
+    ) -> OptimizationResult:
         """
         Find minimum volatility portfolio for target return.
 
         Args:
             target_return: Target annual return
+            x0: Initial weights for the solver (default: equal weight)
 
         Returns:
             OptimizationResult with optimal weights
         """
+        # Closed form when no weight bound binds; SLSQP otherwise
+        analytic = self._analytic_target_return(target_return)
+        if analytic is not None:
+            return self._build_result(analytic)
+
         n_assets = len(self.assets)
-        initial_weights = np.array([1 / n_assets] * n_assets)
+        initial_weights = np.array([1 / n_assets] * n_assets) if x0 is None else x0
 
         bounds = tuple((self.min_weight, self.max_weight) for _ in range(n_assets))
         constraints = [
-            {"type": "eq", "fun": lambda x: np.sum(x) - 1},
+            {"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: np.ones_like(x)},
             {
                 "type": "eq",
-                "fun": lambda x: np.sum(self.expected_returns.values * x) - target_return,
+                "fun": lambda x: self._mu @ x - target_return,
+                "jac": lambda x: self._mu,
             },
         ]
 
         result = minimize(
             self._portfolio_volatility,
             initial_weights,
+            jac=self._portfolio_volatility_jac,
             method="SLSQP",
             bounds=bounds,
             constraints=constraints,
             options={"ftol": 1e-9},
         )
 
-        weights = pd.Series(result.x, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(result.x)
-
-        return OptimizationResult(weights=weights, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
+        return self._build_result(result.x)
 
     def generate_efficient_frontier(self, num_portfolios: int = 100) -> Dict[str, np.ndarray]:
         """
@@ -203,20 +362,66 @@ class PortfolioOptimizer:
             Dictionary with volatilities, returns, and Sharpe ratios
         """
         # Generate target returns from min to max possible
-        min_ret = self.optimize_min_volatility().expected_return
-        max_ret = self.optimize_max_return().expected_return
+        min_result = self.optimize_min_volatility()
+        max_result = self.optimize_max_return()
 
-        target_returns = np.linspace(min_ret, max_ret, num_portfolios)
+        target_returns = np.linspace(
+            min_result.expected_return, max_result.expected_return, num_portfolios
+        )
         volatilities = []
         returns = []
         sharpes = []
 
-        for target_ret in target_returns:
+        # Build the problem once; only the target return changes between solves
+        n_assets = len(self.assets)
+        bounds = tuple((self.min_weight, self.max_weight) for _ in range(n_assets))
+        target = np.zeros(1)
+        constraints = [
+            {"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: np.ones_like(x)},
+            {
+                "type": "eq",
+                "fun": lambda x: self._mu @ x - target[0],
+                "jac": lambda x: self._mu,
+            },
+        ]
+
+        # The endpoints are the min-volatility and max-return solutions already
+        # found; interior points warm-start from their neighbour's weights
+        initial_weights = min_result.weights.values
+        last = len(target_returns) - 1
+        for i, target_ret in enumerate(target_returns):
+            if i == 0 or i == last:
+                endpoint = min_result if i == 0 else max_result
+                volatilities.append(endpoint.volatility)
+                returns.append(endpoint.expected_return)
+                sharpes.append(endpoint.sharpe_ratio)
+                continue
+
+            analytic = self._analytic_target_return(target_ret)
+            if analytic is not None:
+                initial_weights = analytic
+                ret, vol, sharpe = self._calculate_portfolio_metrics(analytic)
+                volatilities.append(vol)
+                returns.append(ret)
+                sharpes.append(sharpe)
+                continue
+
+            target[0] = target_ret
             try:
-                result = self.optimize_target_return(target_ret)
-                volatilities.append(result.volatility)
-                returns.append(result.expected_return)
-                sharpes.append(result.sharpe_ratio)
+                result = minimize(
+                    self._portfolio_volatility,
+                    initial_weights,
+                    jac=self._portfolio_volatility_jac,
+                    method="SLSQP",
+                    bounds=bounds,
+                    constraints=constraints,
+                    options={"ftol": 1e-9},
+                )
+                initial_weights = result.x
+                ret, vol, sharpe = self._calculate_portfolio_metrics(result.x)
+                volatilities.append(vol)
+                returns.append(ret)
+                sharpes.append(sharpe)
             except:
                 continue
 
@@ -226,14 +431,41 @@ class PortfolioOptimizer:
             "sharpe_ratios": np.array(sharpes),
         }
 
+    def analytical_frontier(self, num_points: int = 100) -> Dict[str, np.ndarray]:
+        """
+        Trace the efficient frontier in closed form (two-fund separation).
+
+        Only the budget constraint is enforced, so short positions are allowed
+        and the curve bounds the long-only frontier from the left. No solver
+        calls are made: the frontier variance for a target return r is
+        (c*r^2 - 2*b*r + a) / (a*c - b^2) with a = mu'S^-1 mu, b = mu'S^-1 1
+        and c = 1'S^-1 1.
+
+        Args:
+            num_points: Number of points to generate
+
+        Returns:
+            Dictionary with volatilities, returns, and Sharpe ratios
+        """
+        mu = self._mu
+        _, _, a, b, c = self._frontier_terms()
+
+        # Sweep from the global minimum-variance return up to the best single asset
+        returns = np.linspace(b / c, max(mu.max(), b / c), num_points)
+        volatilities = np.sqrt((c * returns ** 2 - 2 * b * returns + a) / (a * c - b ** 2))
+        sharpes = (returns - self.risk_free_rate) / volatilities
+
+        return {
+            "volatilities": volatilities,
+            "returns": returns,
+            "sharpe_ratios": sharpes,
+        }
+
     def equal_weight(self) -> OptimizationResult:
         """Get equal-weight portfolio."""
         n_assets = len(self.assets)
         weights = np.array([1 / n_assets] * n_assets)
-        weights_series = pd.Series(weights, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(weights)
-
-        return OptimizationResult(weights=weights_series, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
+        return self._build_result(weights)
 
     def cap_weight(self, market_caps: Dict[str, float]) -> OptimizationResult:
         """
@@ -247,7 +479,4 @@ class PortfolioOptimizer:
         """
         caps = np.array([market_caps.get(asset, 1.0) for asset in self.assets])
         weights = caps / caps.sum()
-        weights_series = pd.Series(weights, index=self.assets)
-        ret, vol, sharpe = self._calculate_portfolio_metrics(weights)
-
-        return OptimizationResult(weights=weights_series, expected_return=ret, volatility=vol, sharpe_ratio=sharpe)
+        return self._build_result(weights)
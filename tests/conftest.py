@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures for the financial modelling tests.
+"""
+
+import numpy as np
+import pytest
+
+# Fixed seed so repeated runs of the suite see the same sample data
+SEED = 20250101
+
+
+@pytest.fixture(scope="session")
+def make_rng():
+    """
+    Factory for per-consumer random generators.
+
+    Each fixture or test asks for its own stream number, so the data it draws
+    does not depend on which other tests were collected, their order, or the
+    pytest-xdist worker they run on.
+    """
+
+    def factory(stream: int) -> np.random.Generator:
+        return np.random.default_rng([SEED, stream])
+
+    return factory
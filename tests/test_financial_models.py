@@ -1,7 +1,13 @@
 """
 Unit tests for the financial modelling system.
+
+Fixtures are side-effect free (tests never mutate shared objects and only
+write files under temporary directories), so the suite can run in parallel
+with pytest-xdist: ``pytest tests/ -n auto``.
 """
 
+import os
+
 import pytest
 import numpy as np
 import pandas as pd
@@ -14,94 +20,202 @@ from financial_modelling import (
     MetricsCalculator,
     PortfolioOptimizer,
 )
+from financial_modelling import data_manager as data_manager_module
+
+# Rows per sample series; quick runs use the small default, TEST_SAMPLE_N=252 a full year
+SAMPLE_N = int(os.environ.get("TEST_SAMPLE_N", "64"))
+
+# Consecutive daily dates, built with one arange rather than date_range
+SAMPLE_DATES = pd.DatetimeIndex(np.datetime64("2023-01-01") + np.arange(SAMPLE_N))
 
 
-@pytest.fixture
-def sample_prices():
-    """Create sample price data."""
-    dates = pd.date_range(start="2023-01-01", periods=252, freq="D")
-    prices = pd.Series(
-        np.random.choice([100 * (1.001 ** i) for i in range(100)], size=252),
-        index=dates,
+@pytest.fixture(scope="session")
+def sample_prices(make_rng):
+    """Create sample price data (shared read-only across the session)."""
+    rng = make_rng(0)
+    pool = 100.0 * np.power(1.001, np.arange(100))
+    return pd.Series(rng.choice(pool, size=SAMPLE_N), index=SAMPLE_DATES)
+
+
+@pytest.fixture(scope="session")
+def sample_returns(make_rng):
+    """Create sample returns data (shared read-only across the session)."""
+    rng = make_rng(1)
+    data = rng.normal(
+        loc=[0.0005, 0.0005, 0.0006], scale=[0.01, 0.012, 0.011], size=(SAMPLE_N, 3)
     )
-    return prices
+    return pd.DataFrame(data, index=SAMPLE_DATES, columns=["ETF1", "ETF2", "ETF3"])
 
 
-@pytest.fixture
-def sample_returns():
-    """Create sample returns data."""
-    dates = pd.date_range(start="2023-01-01", periods=252, freq="D")
-    data = {
-        "ETF1": np.random.normal(0.0005, 0.01, 252),
-        "ETF2": np.random.normal(0.0005, 0.012, 252),
-        "ETF3": np.random.normal(0.0006, 0.011, 252),
-    }
-    return pd.DataFrame(data, index=dates)
+@pytest.fixture(scope="module")
+def data_manager(tmp_path_factory):
+    """Empty DataManager caching into a temporary directory."""
+    return DataManager(cache_dir=str(tmp_path_factory.mktemp("dm_cache")))
 
 
-class TestFinancialModel:
-    """Test FinancialModel class."""
+@pytest.fixture(scope="module")
+def returns(sample_prices):
+    """Simple returns of sample_prices, computed once for the module."""
+    return MetricsCalculator.calculate_returns(sample_prices)
 
-    def test_annualized_return(self, sample_prices):
-        """Test annualized return calculation."""
-        model = FinancialModel(sample_prices)
-        ret = model.calculate_annualized_return()
-        assert isinstance(ret, float)
 
-    def test_annualized_volatility(self, sample_prices):
-        """Test annualized volatility calculation."""
-        model = FinancialModel(sample_prices)
-        vol = model.calculate_annualized_volatility()
-        assert vol > 0
+@pytest.fixture(scope="module")
+def returns_np(returns):
+    """The returns fixture as a plain ndarray, for the ndarray-accepting metrics."""
+    return returns.to_numpy()
+
+
+@pytest.fixture(scope="module")
+def fin_model(sample_prices):
+    """FinancialModel shared by tests that only read from it."""
+    return FinancialModel(sample_prices)
+
+
+@pytest.fixture(scope="module")
+def portfolio(sample_returns):
+    """Equal-weight PortfolioModel shared by tests that only read from it."""
+    return PortfolioModel(sample_returns)
 
-    def test_sharpe_ratio(self, sample_prices):
-        """Test Sharpe ratio calculation."""
-        model = FinancialModel(sample_prices)
-        sharpe = model.calculate_sharpe_ratio()
-        assert isinstance(sharpe, float)
 
-    def test_max_drawdown(self, sample_prices):
-        """Test max drawdown calculation."""
-        model = FinancialModel(sample_prices)
-        dd = model.calculate_max_drawdown()
-        assert dd <= 0  # Drawdown should be negative
+@pytest.fixture(scope="module")
+def optimizer(sample_returns):
+    """PortfolioOptimizer shared by tests that only read from it."""
+    return PortfolioOptimizer(sample_returns)
 
-    def test_metrics(self, sample_prices):
+
+@pytest.fixture(scope="module")
+def max_sharpe(optimizer):
+    """Max Sharpe result of the shared optimizer, solved once."""
+    return optimizer.optimize_max_sharpe()
+
+
+@pytest.fixture(scope="module")
+def min_volatility(optimizer):
+    """Min volatility result of the shared optimizer, solved once."""
+    return optimizer.optimize_min_volatility()
+
+
+class TestFinancialModel:
+    """Test FinancialModel class."""
+
+    @pytest.mark.parametrize(
+        "method,check",
+        [
+            ("calculate_annualized_return", lambda r: isinstance(r, float)),
+            ("calculate_annualized_volatility", lambda v: v > 0),
+            ("calculate_sharpe_ratio", lambda s: isinstance(s, float)),
+            ("calculate_max_drawdown", lambda d: d <= 0),  # Drawdown should be negative
+        ],
+    )
+    def test_metric(self, fin_model, method, check):
+        """Test each single-metric calculation against its invariant."""
+        assert check(getattr(fin_model, method)())
+
+    def test_sortino_ratio(self, fin_model):
+        """Test Sortino ratio against a pandas downside deviation."""
+        downside = fin_model.returns[fin_model.returns < 0].std() * np.sqrt(252)
+        expected = fin_model.calculate_annualized_return() / downside
+        assert np.isclose(fin_model.calculate_sortino_ratio(), expected)
+
+    def test_rolling_return(self, fin_model):
+        """Test rolling annualized return of the last full window."""
+        window = min(21, SAMPLE_N // 2)
+        rolling = fin_model.calculate_rolling_return(window=window)
+        expected = (1 + fin_model.returns.iloc[-window:]).prod() ** (252 / window) - 1
+        assert np.isclose(rolling.iloc[-1], expected)
+        assert rolling.iloc[: window - 1].isna().all()
+
+    def test_metrics(self, fin_model):
         """Test metrics calculation."""
-        model = FinancialModel(sample_prices)
-        metrics = model.calculate_metrics()
+        metrics = fin_model.calculate_metrics()
         assert metrics.annualized_volatility > 0
         assert metrics.max_drawdown <= 0
 
+    def test_metrics_batch(self, sample_returns):
+        """Test batch metrics match per-asset calculation."""
+        prices = 100 * (1 + sample_returns).cumprod()
+        batch = FinancialModel.calculate_metrics_batch(prices)
+        for ticker in prices.columns:
+            metrics = FinancialModel(prices[ticker]).calculate_metrics()
+            row = batch.loc[ticker]
+            assert np.isclose(row.annualized_return, metrics.annualized_return)
+            assert np.isclose(row.sharpe_ratio, metrics.sharpe_ratio)
+            assert np.isclose(row.max_drawdown, metrics.max_drawdown)
+
+    def test_metrics_batch_interior_gap(self, sample_returns):
+        """Test batch metrics skip a mid-series gap like per-ticker calculation."""
+        prices = 100 * (1 + sample_returns).cumprod()
+        gap = slice(SAMPLE_N // 3, SAMPLE_N // 3 + 3)
+        prices.iloc[gap, 0] = np.nan
+        batch = FinancialModel.calculate_metrics_batch(prices)
+        for ticker in prices.columns:
+            metrics = FinancialModel(prices[ticker].dropna()).calculate_metrics()
+            row = batch.loc[ticker]
+            assert np.isclose(row.cumulative_return, metrics.cumulative_return)
+            assert np.isclose(row.annualized_volatility, metrics.annualized_volatility)
+            assert np.isclose(row.sortino_ratio, metrics.sortino_ratio)
+            assert np.isclose(row.max_drawdown, metrics.max_drawdown)
+
+    def test_metrics_batch_empty(self):
+        """Test batch metrics of an empty price frame are an empty frame."""
+        batch = FinancialModel.calculate_metrics_batch(pd.DataFrame())
+        assert batch.empty
+        assert "sharpe_ratio" in batch.columns
+
+    @pytest.mark.slow
+    def test_metrics_batch_full_year(self, make_rng):
+        """Test batch metrics on a full trading year regardless of SAMPLE_N."""
+        rng = make_rng(2)
+        returns = pd.DataFrame(rng.normal(0.0005, 0.01, size=(252, 3)), columns=["A", "B", "C"])
+        prices = 100 * (1 + returns).cumprod()
+        batch = FinancialModel.calculate_metrics_batch(prices)
+        for ticker in prices.columns:
+            metrics = FinancialModel(prices[ticker]).calculate_metrics()
+            row = batch.loc[ticker]
+            assert np.isclose(row.sortino_ratio, metrics.sortino_ratio)
+            assert np.isclose(row.annualized_volatility, metrics.annualized_volatility)
+
 
 class TestPortfolioModel:
     """Test PortfolioModel class."""
 
-    def test_portfolio_return(self, sample_returns):
+    def test_portfolio_return(self, portfolio):
         """Test portfolio return calculation."""
-        portfolio = PortfolioModel(sample_returns)
         ret = portfolio.calculate_portfolio_return()
         assert isinstance(ret, float)
 
-    def test_portfolio_volatility(self, sample_returns):
+    def test_portfolio_volatility(self, portfolio):
         """Test portfolio volatility calculation."""
-        portfolio = PortfolioModel(sample_returns)
         vol = portfolio.calculate_portfolio_volatility()
         assert vol > 0
 
-    def test_correlation_matrix(self, sample_returns):
+    def test_correlation_matrix(self, portfolio):
         """Test correlation matrix calculation."""
-        portfolio = PortfolioModel(sample_returns)
         corr = portfolio.calculate_correlation_matrix()
         assert isinstance(corr, pd.DataFrame)
         assert corr.shape == (3, 3)
 
-    def test_var_cvar(self, sample_returns):
-        """Test VaR and CVaR calculation."""
+    def test_covariance_shared(self, portfolio):
+        """Test volatility and the covariance getter reuse one cached matrix."""
+        cov = portfolio.calculate_covariance_matrix()
+        weights = portfolio.weights.values
+        expected = np.sqrt(weights @ cov.values @ weights)
+        assert np.isclose(portfolio.calculate_portfolio_volatility(), expected)
+        assert portfolio._get_cov() is portfolio._get_cov()
+
+    def test_covariance_refreshed_with_returns(self, sample_returns):
+        """Test cached covariance is dropped when returns are replaced."""
         portfolio = PortfolioModel(sample_returns)
+        vol = portfolio.calculate_portfolio_volatility()
+        portfolio.returns = sample_returns * 2
+        assert np.isclose(portfolio.calculate_portfolio_volatility(), 2 * vol)
+        assert np.allclose(portfolio.calculate_covariance_matrix(), sample_returns.cov() * 4 * 252)
+
+    def test_var_cvar(self, portfolio):
+        """Test VaR and CVaR calculation."""
         var = portfolio.calculate_var()
         cvar = portfolio.calculate_cvar()
-        assert var < cvar < 0  # Both should be negative
+        assert cvar <= var < 0  # CVaR averages the tail at or below VaR
 
 
 class TestMetricsCalculator:
@@ -110,26 +224,54 @@ class TestMetricsCalculator:
     def test_calculate_returns(self, sample_prices):
         """Test return calculation."""
         returns = MetricsCalculator.calculate_returns(sample_prices)
-        assert len(returns) < len(sample_prices)
-        assert returns.notna().sum() > 0
+        assert len(returns) == len(sample_prices)
+        assert np.isnan(returns.iloc[0])  # No prior price for the first period
+        assert returns.notna().any()
 
-    def test_cumulative_returns(self, sample_prices):
+    def test_cumulative_returns(self, returns):
         """Test cumulative return calculation."""
-        returns = MetricsCalculator.calculate_returns(sample_prices)
         cum_returns = MetricsCalculator.calculate_cumulative_returns(returns)
-        assert cum_returns.iloc[0] == returns.iloc[0]
+        # The first row is the NaN with no prior price; compounding starts after it
+        assert np.isclose(cum_returns.iloc[1], returns.iloc[1])
+        assert np.isclose(cum_returns.iloc[-1], (1 + returns.dropna()).prod() - 1)
 
-    def test_skewness(self, sample_prices):
+    def test_skewness(self, returns, returns_np):
         """Test skewness calculation."""
-        returns = MetricsCalculator.calculate_returns(sample_prices)
-        skew = MetricsCalculator.calculate_skewness(returns)
+        skew = MetricsCalculator.calculate_skewness(returns_np)
         assert isinstance(skew, float)
-
-    def test_win_rate(self, sample_prices):
+        assert np.isclose(skew, MetricsCalculator.calculate_skewness(returns))
+
+    def test_moments_match_pandas(self, returns):
+        """Test skewness and kurtosis agree with pandas."""
+        assert np.isclose(MetricsCalculator.calculate_skewness(returns), returns.skew())
+        assert np.isclose(MetricsCalculator.calculate_kurtosis(returns), returns.kurtosis())
+
+    def test_stress_test(self, returns):
+        """Test stress test tail metrics."""
+        # Keep at least two observations in the tail for small SAMPLE_N
+        percentile = max(5.0, 200.0 / SAMPLE_N)
+        stress = MetricsCalculator.calculate_stress_test(returns, percentile=percentile)
+        assert np.isclose(stress["worst_return"], returns.min())
+        assert np.isclose(stress["worst_10_return"], returns.nsmallest(10).mean())
+        assert stress["worst_return"] <= stress["avg_worst_return"]
+
+    def test_monte_carlo_var(self, sample_returns):
+        """Test Monte Carlo VaR and CVaR ordering."""
+        var, cvar = MetricsCalculator.calculate_monte_carlo_var(sample_returns["ETF1"])
+        assert cvar <= var < 0
+
+    def test_rolling_kurtosis(self, sample_returns):
+        """Test rolling kurtosis matches per-window kurtosis."""
+        returns = sample_returns["ETF1"]
+        window = min(30, SAMPLE_N // 2)
+        rolling = MetricsCalculator.calculate_rolling_metrics(returns, window=window)
+        assert np.isclose(rolling["kurtosis"].iloc[-1], returns.iloc[-window:].kurtosis())
+
+    def test_win_rate(self, returns, returns_np):
         """Test win rate calculation."""
-        returns = MetricsCalculator.calculate_returns(sample_prices)
-        wr = MetricsCalculator.calculate_win_rate(returns)
+        wr = MetricsCalculator.calculate_win_rate(returns_np)
         assert 0 <= wr <= 1
+        assert wr == MetricsCalculator.calculate_win_rate(returns)
 
     def test_herfindahl_index(self):
         """Test Herfindahl index calculation."""
@@ -147,50 +289,187 @@ class TestMetricsCalculator:
 class TestPortfolioOptimizer:
     """Test PortfolioOptimizer class."""
 
-    def test_equal_weight(self, sample_returns):
+    def test_equal_weight(self, optimizer):
         """Test equal weight portfolio."""
-        optimizer = PortfolioOptimizer(sample_returns)
         result = optimizer.equal_weight()
         assert np.isclose(result.weights.sum(), 1.0)
-        assert all(result.weights == 1/3)
+        assert np.allclose(result.weights.values, 1.0 / 3.0)
 
-    def test_max_sharpe(self, sample_returns):
+    def test_max_sharpe(self, max_sharpe):
         """Test max Sharpe optimization."""
-        optimizer = PortfolioOptimizer(sample_returns)
-        result = optimizer.optimize_max_sharpe()
+        result = max_sharpe
         assert np.isclose(result.weights.sum(), 1.0)
-        assert all(result.weights >= 0)
+        assert (result.weights.values >= -1e-12).all()
 
-    def test_min_volatility(self, sample_returns):
+    def test_min_volatility(self, min_volatility):
         """Test min volatility optimization."""
-        optimizer = PortfolioOptimizer(sample_returns)
-        result = optimizer.optimize_min_volatility()
+        result = min_volatility
         assert np.isclose(result.weights.sum(), 1.0)
-        assert all(result.weights >= 0)
+        assert (result.weights.values >= -1e-12).all()
+
+    def test_min_volatility_below_max_sharpe(self, min_volatility, max_sharpe):
+        """Test min volatility portfolio is no riskier than max Sharpe."""
+        assert min_volatility.volatility <= max_sharpe.volatility + 1e-8
+
+    def test_max_sharpe_below_risk_free(self, make_rng):
+        """Test max Sharpe is no worse than any single asset when returns trail rf."""
+        rng = make_rng(4)
+        data = rng.normal([0.0001, 0.0002, -0.0001], [0.01, 0.02, 0.006], size=(64, 3))
+        optimizer = PortfolioOptimizer(pd.DataFrame(data), risk_free_rate=0.1)
+        result = optimizer.optimize_max_sharpe()
+        corners = [-optimizer._negative_sharpe(w) for w in np.eye(3)]
+        assert result.sharpe_ratio >= max(corners) - 1e-9
+
+    def test_closed_form_matches_slsqp(self, sample_returns):
+        """Test closed-form portfolios agree with SLSQP and respect bounds."""
+        from scipy.optimize import minimize
+
+        optimizer = PortfolioOptimizer(sample_returns, min_weight=-1.0, max_weight=2.0)
+        analytic = optimizer.optimize_min_volatility().weights.values
+        numeric = minimize(
+            optimizer._portfolio_volatility,
+            np.ones(3) / 3,
+            method="SLSQP",
+            bounds=[(-1.0, 2.0)] * 3,
+            constraints={"type": "eq", "fun": lambda x: np.sum(x) - 1},
+            options={"ftol": 1e-12},
+        ).x
+        assert np.allclose(analytic, numeric, atol=1e-4)
+
+        bounded = PortfolioOptimizer(sample_returns, max_weight=0.4).optimize_max_sharpe()
+        assert (bounded.weights.values <= 0.4 + 1e-6).all()
+        assert (bounded.weights.values >= -1e-12).all()
+        assert abs(bounded.weights.sum() - 1) < 1e-6
+
+    def test_covariance_factored_once(self, sample_returns, monkeypatch):
+        """Test every optimization reuses one cached Cholesky factorization."""
+        from financial_modelling import optimization
+
+        cho_factor = optimization.cho_factor
+        calls = []
+
+        def counting_cho_factor(*args, **kwargs):
+            calls.append(args)
+            return cho_factor(*args, **kwargs)
+
+        monkeypatch.setattr(optimization, "cho_factor", counting_cho_factor)
 
-    def test_efficient_frontier(self, sample_returns):
-        """Test efficient frontier generation."""
         optimizer = PortfolioOptimizer(sample_returns)
-        frontier = optimizer.generate_efficient_frontier(num_portfolios=20)
+        optimizer.optimize_min_volatility()
+        optimizer.optimize_max_sharpe()
+        optimizer.analytical_frontier(num_points=5)
+        optimizer.generate_efficient_frontier(num_portfolios=5)
+        assert len(calls) == 1
+
+    def test_objective_gradients(self, sample_returns):
+        """Test analytic objective gradients against finite differences."""
+        from scipy.optimize import check_grad
+
+        optimizer = PortfolioOptimizer(sample_returns)
+        weights = np.array([0.5, 0.3, 0.2])
+        for name in ["_negative_sharpe", "_portfolio_volatility", "_negative_return"]:
+            objective = getattr(optimizer, name)
+            gradient = getattr(optimizer, f"{name}_jac")
+            assert check_grad(objective, gradient, weights) < 1e-5
+
+    def test_float32_returns_upcast(self, sample_returns):
+        """Test moment estimates are float64 for float32 returns."""
+        optimizer = PortfolioOptimizer(sample_returns.astype(np.float32))
+        assert optimizer.expected_returns.dtype == np.float64
+        assert (optimizer.cov_matrix.dtypes == np.float64).all()
+
+    def test_duplicate_assets_rejected(self, sample_returns):
+        """Test duplicated asset columns are rejected."""
+        duplicated = pd.concat([sample_returns, sample_returns["ETF1"]], axis=1)
+        with pytest.raises(ValueError):
+            PortfolioOptimizer(duplicated)
+
+    def test_efficient_frontier(self, optimizer):
+        """Test efficient frontier generation."""
+        frontier = optimizer.generate_efficient_frontier(num_portfolios=5)
         assert "volatilities" in frontier
         assert "returns" in frontier
         assert len(frontier["volatilities"]) > 0
 
+    @pytest.mark.slow
+    def test_efficient_frontier_dense(self, optimizer):
+        """Test a denser efficient frontier sweep."""
+        frontier = optimizer.generate_efficient_frontier(num_portfolios=20)
+        assert len(frontier["volatilities"]) == 20
+        assert np.all(np.diff(frontier["returns"]) >= -1e-8)
+
+    def test_analytical_frontier(self, optimizer, min_volatility):
+        """Test closed-form frontier bounds the long-only minimum volatility."""
+        frontier = optimizer.analytical_frontier(num_points=20)
+        assert len(frontier["volatilities"]) == 20
+        assert frontier["volatilities"].min() <= min_volatility.volatility + 1e-6
+
 
 class TestDataManager:
     """Test DataManager class."""
 
-    def test_initialization(self):
+    def test_initialization(self, data_manager):
         """Test DataManager initialization."""
-        dm = DataManager()
-        assert dm.cache_dir is not None
+        assert data_manager.cache_dir is not None
 
-    def test_get_combined_data_empty(self):
+    def test_get_combined_data_empty(self, data_manager):
         """Test combined data with no data loaded."""
-        dm = DataManager()
-        data = dm.get_combined_data()
+        data = data_manager.get_combined_data()
         assert data.empty
 
+    def test_parquet_cache_reread_on_change(self, sample_prices, tmp_path):
+        """Test cached parquet tables are shared and reused until the file changes."""
+        dm = DataManager(cache_dir=str(tmp_path))
+        path = dm._get_cache_path("ETF1", "2023-01-01", "2023-12-31")
+        sample_prices.to_frame("ETF1").to_parquet(path)
+        first = dm.fetch_data(["ETF1"], "2023-01-01", "2023-12-31")["ETF1"]
+        assert path in data_manager_module._parquet_tables
+
+        (sample_prices * 2).to_frame("ETF1").to_parquet(path)
+        os.utime(path, (0, os.path.getmtime(path) + 1))
+        # A fresh manager, as the app builds on each rerun, sees the new file
+        dm = DataManager(cache_dir=str(tmp_path))
+        second = dm.fetch_data(["ETF1"], "2023-01-01", "2023-12-31")["ETF1"]
+        assert np.allclose(second["ETF1"].values, 2 * first["ETF1"].values)
+
+        dm.clear_cache()
+        assert path not in data_manager_module._parquet_tables
+
+    def test_get_info_stub_not_cached(self, data_manager, monkeypatch):
+        """Test an empty info response falls back to {} and is retried later."""
+        responses = [{}, {"longName": "Test ETF"}]
+
+        class FakeTicker:
+            def __init__(self, ticker):
+                self.info = responses.pop(0)
+
+        monkeypatch.setattr(data_manager_module.yf, "Ticker", FakeTicker)
+        data_manager_module._fetch_info.cache_clear()
+        try:
+            assert data_manager.get_info("ETF1") == {}
+            assert data_manager.get_info("ETF1")["name"] == "Test ETF"
+        finally:
+            data_manager_module._fetch_info.cache_clear()
+
+    def test_combined_data_outer_join(self, sample_prices, tmp_path):
+        """Test combined data aligns tickers with different histories."""
+        dm = DataManager(cache_dir=str(tmp_path))
+        dm.data = {
+            "ETF1": sample_prices.to_frame("ETF1"),
+            "ETF2": sample_prices.iloc[SAMPLE_N // 2 :].to_frame("ETF2"),
+        }
+        combined = dm.get_combined_data()
+        expected = pd.concat(dm.data.values(), axis=1)
+        pd.testing.assert_frame_equal(combined, expected)
+
+    def test_log_returns(self, sample_prices, tmp_path):
+        """Test log returns from loaded price data."""
+        dm = DataManager(cache_dir=str(tmp_path))
+        dm.data = {"ETF1": sample_prices.to_frame("ETF1")}
+        returns = dm.get_returns(method="log")
+        expected = np.log(sample_prices / sample_prices.shift(1)).dropna()
+        assert np.allclose(returns["ETF1"].values, expected.values)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])